@@ -8,7 +8,6 @@ Released under the GPL version 3, or (at your option) any later version.
 import argparse
 import asyncio
 import atexit
-import copy
 import gettext
 import importlib
 import importlib.metadata
@@ -16,9 +15,9 @@ import importlib.resources
 import locale
 import math
 import os
-import pickle
 import warnings
 import zipfile
+from array import array
 from collections.abc import Callable
 from enum import StrEnum
 from itertools import chain
@@ -64,7 +63,7 @@ def _(message: str) -> str:
 
 DATA_DIR = Path(user_data_dir("chambercourt"))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
-SAVED_POSITION_FILE = DATA_DIR / "saved_position.pkl"
+SAVED_POSITION_FILE = DATA_DIR / "saved_position.dat"
 
 
 def clear_keys() -> None:
@@ -106,6 +105,21 @@ DIGIT_KEYS = {
 }
 
 
+# Player control keys
+LEFT_KEYS = (pygame.K_LEFT, pygame.K_z)
+RIGHT_KEYS = (pygame.K_RIGHT, pygame.K_x)
+UP_KEYS = (pygame.K_UP, pygame.K_QUOTE)
+DOWN_KEYS = (pygame.K_DOWN, pygame.K_SLASH)
+
+# Unit vectors passed to `Game.try_move`; they must not be modified.
+UNIT_VECTORS = {
+    (-1, 0): Vector2(-1, 0),
+    (1, 0): Vector2(1, 0),
+    (0, -1): Vector2(0, -1),
+    (0, 1): Vector2(0, 1),
+}
+
+
 class Game[Tile: StrEnum]:
     """The `Game` class represents the state of a game.
 
@@ -197,6 +211,11 @@ class Game[Tile: StrEnum]:
         self.music_volume = 0.7
         """Volume of music track."""
 
+        self.max_parsed_levels = 4
+        """Number of parsed levels to keep in memory.
+
+        The current level is always kept, even if this is 0."""
+
         self.clock = pygame.time.Clock()
         self.num_levels: int
         self.real_levels_path: Path
@@ -207,7 +226,8 @@ class Game[Tile: StrEnum]:
         self.window_pixel_width: int
         self.window_pixel_height: int
         self.window_pos: tuple[int, int] = (0, 0)
-        self.game_surface: pygame.Surface
+        self.game_surface = pygame.Surface((0, 0), pygame.SRCALPHA)
+        self._scaled_game_surface = pygame.Surface((0, 0), pygame.SRCALPHA)
         self.surface: pygame.Surface
         self.quit = False
         self.exit = False
@@ -218,15 +238,24 @@ class Game[Tile: StrEnum]:
         self.tile_width: int
         self.tile_height: int
         self.tmx_data: dict[Path, pytmx.TiledMap] = {}
-        self.map_tiles: dict[Path, pytmx.TiledTileLayer] = {}
+        self.map_tiles: dict[Path, list[array[int]]] = {}
         self.map_timestamp: dict[Path, float] = {}
-        self._map_tiles: pytmx.TiledTileLayer
+        self._map_tiles: list[array[int]]
         self._gids: dict[Tile, int]
+        self._tiles: dict[int, Tile]
+        self._static_gids: set[int]
+        self._animated_map: bool
+        self._layered_map: bool
+        self._active_tiles: set[tuple[int, int]]
+        self._dirty_tiles: set[tuple[int, int]] = set()
         self._map_layer: pyscroll.BufferedRenderer
         self._group: pyscroll.PyscrollGroup
         self.hero: Hero
         self.map_data: pyscroll.data.TiledMapData
         self._joysticks: dict[int, pygame.joystick.JoystickType] = {}
+        self._held_keys: set[int] = set()
+        self._asset_paths: dict[str, Path] = {}
+        self._screen_dirty = True
         self.music_muted = False
         self.license_string = _("""Distributed under the GNU General Public License version 3, or (at
 your option) any later version. There is no warranty.""")
@@ -273,17 +302,19 @@ Game instructions go here.
         Args:
             asset_file (str): name of asset file
         """
-        levels_asset = self.real_levels_path / asset_file
-        if levels_asset.exists():
-            return levels_asset
-        else:
-            fallback_asset = Path(self.app_path / "levels" / asset_file)
-            if fallback_asset.exists():
-                return fallback_asset
-            else:
-                built_in_asset = Path(self.fallback_path / "levels" / asset_file)
-                if built_in_asset.exists():
-                    return built_in_asset
+        # Assets are looked up repeatedly, e.g. tilesets for each level, so
+        # remember where they were found.
+        if asset_file in self._asset_paths:
+            return self._asset_paths[asset_file]
+        for directory in (
+            self.real_levels_path,
+            Path(self.app_path / "levels"),
+            Path(self.fallback_path / "levels"),
+        ):
+            asset = directory / asset_file
+            if asset.exists():
+                self._asset_paths[asset_file] = asset
+                return asset
         raise OSError(_("cannot find asset `{}'").format(asset_file))
 
     def init_screen(self) -> None:
@@ -389,6 +420,7 @@ Game instructions go here.
             min(255, self.background_colour.g + 160),
             min(255, self.background_colour.b + 160),
         )
+        self._screen_dirty = True
 
     def fade_background(self) -> None:
         """Fade the background.
@@ -396,6 +428,8 @@ Game instructions go here.
         Called every frame to return the background colour to the default
         over a period of several frames.
         """
+        if self.background_colour == self.default_background_colour:
+            return
         self.background_colour = Color(
             max(self.background_colour.r - 10, self.default_background_colour.r),
             max(self.background_colour.g - 10, self.default_background_colour.g),
@@ -418,10 +452,44 @@ Game instructions go here.
 
     def show_screen(self) -> None:
         """Show the current frame, and clear the rendering buffer."""
-        self.surface.blit(self.scale_surface(self.game_surface), self.window_pos)
+        if self.screen_scale == 1:
+            self.surface.blit(self.game_surface, self.window_pos)
+        else:
+            # Scale into a preallocated surface, rather than a new one each
+            # frame
+            pygame.transform.scale(
+                self.game_surface,
+                self._scaled_game_surface.get_size(),
+                self._scaled_game_surface,
+            )
+            self.surface.blit(self._scaled_game_surface, self.window_pos)
         pygame.display.flip()
         self.clear_screen()
         self.fade_background()
+        # Keep redrawing until the background has faded.
+        self._screen_dirty = self.background_colour != self.default_background_colour
+
+    def redraw_needed(self) -> bool:
+        """Indicate whether the game screen needs to be redrawn.
+
+        The main loop skips drawing frames in which nothing has changed.
+        The screen is redrawn when tiles have been set, the hero is moving,
+        there has been input, the background is fading, or the map has
+        animated tiles.
+
+        The screen is also redrawn after every call to `update_map`. Games
+        that change the display in some other way, for example by changing
+        the hero's image or showing a timer in `show_status`, should call
+        `mark_dirty`, or override this method.
+
+        Returns:
+            bool: `True` if the screen should be redrawn this frame
+        """
+        return self._screen_dirty or len(self._dirty_tiles) > 0 or self._animated_map
+
+    def mark_dirty(self) -> None:
+        """Make the main loop redraw the screen in the current frame."""
+        self._screen_dirty = True
 
     def text_to_screen(self, pos: tuple[int, int]) -> tuple[int, int]:
         """Convert character cell coordinates to screen coordinates.
@@ -500,33 +568,38 @@ Game instructions go here.
                 self.real_levels_path = Path(tmpdir.name)
                 with zipfile.ZipFile(self.levels_path) as z:
                     z.extractall(self.real_levels_path)
-                atexit.register(lambda tmpdir: tmpdir.cleanup(), tmpdir)
+                atexit.register(tmpdir.cleanup)
             else:
                 self.real_levels_path = Path(self.levels_path)
-            self.levels_files = sorted(
-                [
-                    file
-                    for file in self.real_levels_path.iterdir()
-                    if (not str(file.name).startswith("."))
-                    and file.is_file()
-                    and file.suffix == ".tmx"
-                ]
-            )
+            # Use `os.scandir`, whose entries can usually say whether they
+            # are files without a further `stat` call.
+            with os.scandir(self.real_levels_path) as entries:
+                self.levels_files = sorted(
+                    self.real_levels_path / entry.name
+                    for entry in entries
+                    if (not entry.name.startswith("."))
+                    and entry.name.endswith(".tmx")
+                    and entry.is_file()
+                )
         except OSError as err:
             die(_("Error reading levels: {}").format(err.strerror))
         self.num_levels = len(self.levels_files)
         if self.num_levels == 0:
             die(_("Could not find any levels"))
+        # Levels are parsed when first played, by `load_level`.
         for level in self.levels_files:
             self.map_timestamp[level] = 0
-            self.load_level(level)
 
     def load_assets(self) -> None:
-        """Load game assets."""
+        """Load game assets.
+
+        Images are converted to the display format once, here, so that
+        blitting them is fast.
+        """
         self.font_path = self.find_asset(self.font_name)
         self.app_icon = pygame.image.load(self.find_asset("app-icon.png"))
-        self.title_image = pygame.image.load(self.find_asset("title.png"))
-        self.hero_image = pygame.image.load(self.find_asset("Hero.png"))
+        self.title_image = pygame.image.load(self.find_asset("title.png")).convert()
+        self.hero_image = pygame.image.load(self.find_asset("Hero.png")).convert_alpha()
 
     def init_renderer(self) -> None:
         """Set up the `pyscroll.BufferedRenderer` and its camera (group)."""
@@ -537,6 +610,9 @@ Game instructions go here.
         )
         self._group = pyscroll.PyscrollGroup(map_layer=self._map_layer)
         self._group.add(self.hero)
+        # The new renderer draws the whole current map.
+        self._dirty_tiles.clear()
+        self._screen_dirty = True
 
     def image_loader(
         self, filename: str, colorkey: pytmx.pytmx.ColorLike | None, **kwargs
@@ -571,18 +647,6 @@ Game instructions go here.
             )
         self.clamp_window()
 
-        # Dict mapping tileset GIDs to map gids
-        map_gids = self.map_data.tmx.gidmap
-        self._gids = {}
-        for i in map_gids:
-            gid = map_gids[i][0][0]
-            properties = self.map_data.tmx.get_tile_properties_by_gid(gid)
-            assert type(properties) is dict
-            tile = self.tile_constructor(properties["type"])
-            if self._gids.get(tile) is not None:
-                raise ValueError(f"non-unique tile {tile}")
-            self._gids[tile] = gid
-
         self.hero = Hero(self.hero_image)
         self.hero.position = Vector2(0, 0)
 
@@ -602,10 +666,17 @@ Game instructions go here.
             self.level_height * self.tile_height,
             self.window_size[1] // self.screen_scale,
         )
-        self.game_surface = pygame.Surface(
-            (self.window_pixel_width, self.window_pixel_height),
-            pygame.SRCALPHA,
-        )
+        # Keep the existing surfaces if their sizes are unchanged, as they
+        # are when restarting a level. The map may have transparent gaps,
+        # so clear the game surface; the scaled surface is overwritten.
+        size = (self.window_pixel_width, self.window_pixel_height)
+        if self.game_surface.get_size() != size:
+            self.game_surface = pygame.Surface(size, pygame.SRCALPHA)
+        else:
+            self.game_surface.fill((0, 0, 0, 0))
+        scaled_size = (size[0] * self.screen_scale, size[1] * self.screen_scale)
+        if self._scaled_game_surface.get_size() != scaled_size:
+            self._scaled_game_surface = pygame.Surface(scaled_size, pygame.SRCALPHA)
 
         self.window_pos = (
             max(
@@ -651,13 +722,11 @@ Game instructions go here.
         x, y = int(pos.x), int(pos.y)
         if not ((0 <= x < self.level_width) and (0 <= y < self.level_height)):
             return self.get_tile_properties(self.default_tile)
-        gid = self._map_tiles[y][x]  # pyright: ignore
+        gid = self._map_tiles[y][x]
         if gid == 0:  # Missing tiles are gaps
             return self.get_tile_properties(self.empty_tile)
         return self._get_gid_properties(gid)
 
-    # TODO: Inline, and try to use the properties dict,
-    # i.e. try to avoid calling `tile_constructor`.
     def get(self, pos: Vector2) -> Tile:
         """Return the tile at the given position.
 
@@ -668,47 +737,126 @@ Game instructions go here.
         Returns:
             Tile: the `Tile` at the given position
         """
-        return self.tile_constructor(self.get_properties(pos)["type"])
+        # Anything outside the map is a default tile
+        x, y = int(pos.x), int(pos.y)
+        if not ((0 <= x < self.level_width) and (0 <= y < self.level_height)):
+            return self.default_tile
+        return self._tiles[self._map_tiles[y][x]]
+
+    def active_tiles(self) -> list[Vector2]:
+        """Return the positions of all active tiles.
+
+        Active tiles are those other than empty and default tiles. Games
+        can use this method to scan only the parts of the map that may
+        change, such as tiles subject to physics.
+
+        Returns:
+            list[Vector2]: the positions, in tile coordinates, sorted by
+            row and then by column
+        """
+        return [
+            Vector2(x, y)
+            for x, y in sorted(self._active_tiles, key=lambda pos: (pos[1], pos[0]))
+        ]
 
     def _set(self, pos: Vector2, tile: Tile) -> None:
         x, y = int(pos.x), int(pos.y)
         if not ((0 <= x < self.level_width) and (0 <= y < self.level_height)):
             return
-        self._map_tiles[y][x] = self._gids[tile]  # pyright: ignore
-        # Update rendered map
-        # NOTE: We invoke protected methods and access protected members.
-        ml = self._map_layer
-        rect = (x, y, 1, 1)
-        assert ml._tile_queue is not None
-        ml._tile_queue = chain(ml._tile_queue, ml.data.get_tile_images_by_rect(rect))
-        assert type(self._map_layer._buffer) is pygame.Surface
-        self._map_layer._flush_tile_queue(self._map_layer._buffer)
+        gid = self._gids[tile]
+        self._map_tiles[y][x] = gid
+        self._dirty_tiles.add((x, y))
+        if gid in self._static_gids:
+            self._active_tiles.discard((x, y))
+        else:
+            self._active_tiles.add((x, y))
 
     def set(self, pos: Vector2, tile: Tile) -> None:
         """Set the tile at the given position.
 
+        The rendered map is updated by the next call to `draw`.
+
         Args:
             pos (Vector2): the `(x, y)` position required, in tile
               coordinates
             tile (Tile): the `Tile` to set at the given position
         """
-        # Update map twice, to allow for transparent tiles
-        self._set(pos, self.empty_tile)
         self._set(pos, tile)
 
-    def set_map(self, map_tiles: pytmx.TiledTileLayer) -> None:
+    def flush_tiles(self) -> None:
+        """Redraw the tiles changed since the last redraw.
+
+        All the changed tiles are drawn in a single batch.
+        """
+        if len(self._dirty_tiles) == 0:
+            return
+        # NOTE: We access protected members.
+        ml = self._map_layer
+        assert type(ml._buffer) is pygame.Surface
+        assert ml._tile_view is not None
+        left, top = ml._tile_view.topleft
+        empty_image = self.map_data.tmx.images[self._gids[self.empty_tile]]
+        blit_list = []
+        for x, y in self._dirty_tiles:
+            dest = ((x - left) * self.tile_width, (y - top) * self.tile_height)
+            # Draw the empty tile first, to allow for transparent tiles
+            if empty_image:
+                blit_list.append((empty_image, dest))
+            blit_list.extend(
+                (image, dest)
+                for _, _, _, image in ml.data.get_tile_images_by_rect((x, y, 1, 1))
+            )
+        ml._buffer.blits(blit_list, doreturn=False)
+        self._dirty_tiles.clear()
+
+    def _init_gids(self) -> None:
+        """Map the current level's gids to and from `Tile`s."""
+        # Dict mapping tileset GIDs to map gids
+        map_gids = self.map_data.tmx.gidmap
+        self._gids = {}
+        # Reverse mapping, used by `get`; missing tiles are gaps
+        self._tiles = {0: self.empty_tile}
+        for i in map_gids:
+            gid = map_gids[i][0][0]
+            properties = self.map_data.tmx.get_tile_properties_by_gid(gid)
+            assert type(properties) is dict
+            tile = self.tile_constructor(properties["type"])
+            if self._gids.get(tile) is not None:
+                raise ValueError(f"non-unique tile {tile}")
+            self._gids[tile] = gid
+            # Flipped and rotated tiles have their own gids
+            for flipped_gid, _ in map_gids[i]:
+                self._tiles[flipped_gid] = tile
+        # Gids of tiles that are left out of `self._active_tiles`
+        self._static_gids = {
+            gid
+            for gid, tile in self._tiles.items()
+            if tile in (self.empty_tile, self.default_tile)
+        }
+        # Animated tiles are advanced only when the map is drawn
+        self._animated_map = any(True for _ in self.map_data.get_animations())
+
+    def set_map(self, map_tiles: list[array[int]]) -> None:
         """Set the current map.
 
         Args:
-            map_tiles (pytmx.TiledTileLayer): the tile data to use.
+            map_tiles (list[array[int]]): the tile data to use, as a list of
+              rows of gids.
         """
         self._map_tiles = map_tiles
         self.map_data.tmx.layers[0].data = self._map_tiles
+        self._active_tiles = {
+            (x, y)
+            for y, row in enumerate(self._map_tiles)
+            for x, gid in enumerate(row)
+            if gid not in self._static_gids
+        }
 
     def load_level(self, level: Path) -> None:
         """Load map data for given level path.
 
-        Reload only if the file has changed.
+        The level is parsed the first time it is loaded, and reparsed only
+        if the file has changed.
 
         Args:
             level (Path): path to level file
@@ -717,10 +865,25 @@ Game instructions go here.
         if mtime > self.map_timestamp[level]:
             self.map_timestamp[level] = mtime
             map_data = pytmx.TiledMap(str(level), image_loader=self.image_loader)
+            self.tmx_data.pop(level, None)
             self.tmx_data[level] = map_data
-            self.map_tiles[level] = copy.deepcopy(self.tmx_data[level].layers[0].data)
+            # Store each row of gids compactly, as an array of machine ints
+            self.map_tiles[level] = [array("H", row) for row in map_data.layers[0].data]
+            # Forget the least recently used levels, which will be
+            # reparsed if they are loaded again.
+            while len(self.tmx_data) > max(1, self.max_parsed_levels):
+                old_level = next(iter(self.tmx_data))
+                del self.tmx_data[old_level]
+                del self.map_tiles[old_level]
+                self.map_timestamp[old_level] = 0
+        else:
+            # Mark the level as most recently used.
+            self.tmx_data[level] = self.tmx_data.pop(level)
         self.map_data = pyscroll.data.TiledMapData(self.tmx_data[level])
-        self.set_map(copy.deepcopy(self.map_tiles[level]))
+        self._layered_map = sum(1 for _ in self.map_data.visible_tile_layers) > 1
+        self._init_gids()
+        # Copy the rows, which hold only ints, by slicing
+        self.set_map([row[:] for row in self.map_tiles[level]])
 
     def set_music_volume(self) -> None:
         """Set the music volume."""
@@ -745,22 +908,37 @@ Game instructions go here.
             pass  # ignore non-existent music
 
     def save_position(self) -> None:
-        """Save the current position."""
+        """Save the current position.
+
+        The map is saved as its raw gids, row by row.
+        """
         self.set(self.hero.position, self.hero_tile)
-        with open(SAVED_POSITION_FILE, "wb") as fh:
-            pickle.dump(self._map_tiles, fh)
+        SAVED_POSITION_FILE.write_bytes(
+            array("H", chain.from_iterable(self._map_tiles)).tobytes()
+        )
         self.set(self.hero.position, self.empty_tile)
 
     def load_position(self) -> None:
         """Reload the saved position, if any.
 
-        If there isn't one, nothing is done.
+        If there isn't one, or it does not fit the current level, nothing is
+        done.
         """
-        if SAVED_POSITION_FILE.exists():
-            with open(SAVED_POSITION_FILE, "rb") as fh:
-                self.set_map(pickle.load(fh))
-            self.init_renderer()
-            self.init_game()
+        if not SAVED_POSITION_FILE.exists():
+            return
+        gids = array("H")
+        data = SAVED_POSITION_FILE.read_bytes()
+        if len(data) != self.level_width * self.level_height * gids.itemsize:
+            return
+        gids.frombytes(data)
+        self.set_map(
+            [
+                gids[y * self.level_width : (y + 1) * self.level_width]
+                for y in range(self.level_height)
+            ]
+        )
+        self.init_renderer()
+        self.init_game()
 
     async def clock_tick(self) -> None:
         """Let clock tick for a frame."""
@@ -768,9 +946,32 @@ Game instructions go here.
         await asyncio.sleep(0)
 
     def draw(self) -> None:
-        """Draw the current position."""
+        """Draw the current position.
+
+        When the map has a single tile layer, the sprites are always above
+        it, so the map and then the sprites are drawn directly. Maps with
+        more layers are drawn by `PyscrollGroup.draw`, which places each
+        sprite among the layers.
+        """
         self._group.center(self.hero.rect.center)
-        self._group.draw(self.game_surface)
+        self.flush_tiles()
+        if self._layered_map:
+            self._group.draw(self.game_surface)
+            return
+        self._map_layer.draw(self.game_surface, self.game_surface.get_rect())
+        ox, oy = self._map_layer.get_center_offset()
+        self.game_surface.blits(
+            [
+                (
+                    sprite.image,
+                    sprite.rect.move(ox, oy),
+                    sprite.image.get_rect(),
+                    getattr(sprite, "blendmode", 0),
+                )
+                for sprite in self._group
+            ],
+            doreturn=False,
+        )
 
     def handle_joystick_plug(self, event: pygame.event.Event) -> None:
         """Track joystick plug/unplug events.
@@ -792,19 +993,17 @@ Game instructions go here.
             tuple[int, int]: the desired unit velocity
         """
         dx, dy = (0, 0)
+        if len(self._joysticks) == 0:
+            return (dx, dy)
         for joystick in self._joysticks.values():
             axes = joystick.get_numaxes()
             if axes >= 2:  # Hopefully 0=L/R and 1=U/D
+                # Map each axis to -1, 0 or 1; a centred axis leaves the
+                # direction from any previous joystick unchanged.
                 lr = joystick.get_axis(0)
-                if lr < -0.5:
-                    dx = -1
-                elif lr > 0.5:
-                    dx = 1
+                dx = (lr > 0.5) - (lr < -0.5) or dx
                 ud = joystick.get_axis(1)
-                if ud < -0.5:
-                    dy = -1
-                elif ud > 0.5:
-                    dy = 1
+                dy = (ud > 0.5) - (ud < -0.5) or dy
         if (dy, dy) != (0, 0):
             pygame.mouse.set_visible(False)
         return (dx, dy)
@@ -887,15 +1086,15 @@ Game instructions go here.
         Returns:
             tuple[int, int]: desired offset.
         """
-        pressed = pygame.key.get_pressed()
+        held = self._held_keys
         new_kdx, new_kdy = (0, 0)
-        if pressed[pygame.K_LEFT] or pressed[pygame.K_z]:
+        if not held.isdisjoint(LEFT_KEYS):
             new_kdx = -1
-        if pressed[pygame.K_RIGHT] or pressed[pygame.K_x]:
+        if not held.isdisjoint(RIGHT_KEYS):
             new_kdx = 1
-        if pressed[pygame.K_UP] or pressed[pygame.K_QUOTE]:
+        if not held.isdisjoint(UP_KEYS):
             new_kdy = -1
-        if pressed[pygame.K_DOWN] or pressed[pygame.K_SLASH]:
+        if not held.isdisjoint(DOWN_KEYS):
             new_kdy = 1
         if (new_kdx, new_kdy) != (kdx, kdy):
             kdx, kdy = (new_kdx, new_kdy)
@@ -952,10 +1151,25 @@ Game instructions go here.
         play_y = start_level_y + 2
         play = False
         self.load_music("title.ogg")
+        redraw = True
+        scaled_title, title_scale = title_image, 0
         while not self.exit and not play:
+            # Only redraw the screen when it may have changed.
+            if not redraw:
+                # Mouse motion only shows the pointer.
+                for event in pygame.event.get(pygame.MOUSEMOTION):
+                    self.handle_global_inputs(event)
+                if not pygame.event.peek():
+                    await self.clock_tick()
+                    continue
+            redraw = False
             self.reinit_screen()
+            # Rescale the title image only when the screen scale changes.
+            if title_scale != self.screen_scale:
+                scaled_title = self.scale_surface(title_image)
+                title_scale = self.screen_scale
             self.surface.blit(
-                self.scale_surface(title_image),
+                scaled_title,
                 (
                     (self.screen_size[0] - title_image.get_width() * self.screen_scale)
                     // 2,
@@ -1045,32 +1259,22 @@ Game instructions go here.
             )
 
             pygame.display.flip()
-            self.handle_quit_event()
             for event in pygame.event.get():
+                redraw = True
                 level_change = 0
-                if event.type == pygame.KEYDOWN:
+                if event.type == pygame.QUIT:
+                    self.exit_game()
+                elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_q:
                         self.exit_game()
                     elif event.key == pygame.K_SPACE:
                         play = True
-                    elif event.key in (
-                        pygame.K_z,
-                        pygame.K_LEFT,
-                        pygame.K_SLASH,
-                        pygame.K_DOWN,
-                    ):
+                    elif event.key in LEFT_KEYS or event.key in DOWN_KEYS:
                         level_change = -1
-                    elif event.key in (
-                        pygame.K_x,
-                        pygame.K_RIGHT,
-                        pygame.K_QUOTE,
-                        pygame.K_UP,
-                    ):
+                    elif event.key in RIGHT_KEYS or event.key in UP_KEYS:
                         level_change = 1
-                    elif event.key in DIGIT_KEYS:
-                        level = min(
-                            self.num_levels, (level or 0) * 10 + DIGIT_KEYS[event.key]
-                        )
+                    elif (digit := DIGIT_KEYS.get(event.key)) is not None:
+                        level = min(self.num_levels, (level or 0) * 10 + digit)
                         if level == 0:
                             level = None
                     else:
@@ -1090,6 +1294,7 @@ Game instructions go here.
                     self.handle_joystick_plug(event)
                 elif event.type in (pygame.WINDOWRESIZED, pygame.WINDOWSIZECHANGED):
                     self.init_screen()
+                self._track_held_keys(event)
                 self.handle_global_inputs(event)
                 (dx, dy) = self.handle_joysticks()
                 level_change += dx - dy
@@ -1177,20 +1382,24 @@ Game instructions go here.
                 frame = 0
                 moving = False
                 self.moves = 0
-                self.hero.velocity = Vector2(0, 0)
+                self.hero.velocity.update(0, 0)
                 self._group.update(0)
                 await self.start_play()
                 dx, dy = 0, 0
                 kdx, kdy = 0, 0
                 jdx, jdy = 0, 0
+                # Only test whether the level is finished between moves.
                 while not self.quit and not (
-                    self.finished() and (frame == 0 or not moving)
+                    (frame == 0 or not moving) and self.finished()
                 ):
                     await self.clock_tick()
 
                     # Check inputs
                     mouse_pressed = False
                     for event in pygame.event.get():
+                        # Mouse motion only shows the pointer.
+                        if event.type != pygame.MOUSEMOTION:
+                            self._screen_dirty = True
                         if event.type == pygame.QUIT:
                             self.exit_game()
                         elif event.type in (pygame.KEYDOWN, pygame.JOYBUTTONDOWN):
@@ -1205,7 +1414,10 @@ Game instructions go here.
                             self.clamp_window()
                             self.init_renderer()
                         self.handle_joystick_plug(event)
+                        self._track_held_keys(event)
                         self.handle_global_inputs(event)
+                    # Poll the controls on every frame, so that keys released
+                    # during a move cancel the next one.
                     (dx, dy), (kdx, kdy), (jdx, jdy) = self.handle_player_controls(
                         mouse_pressed, dx, dy, kdx, kdy, jdx, jdy
                     )
@@ -1214,14 +1426,14 @@ Game instructions go here.
                     if not moving and (dx, dy) != (0, 0):
                         allowed_move = (0, 0)
                         try_dx, try_dy = sign(dx), sign(dy)
-                        if dx != 0 and self.try_move(Vector2(try_dx, 0)):
+                        if dx != 0 and self.try_move(UNIT_VECTORS[(try_dx, 0)]):
                             allowed_move = (try_dx, 0)
                             dx -= try_dx
-                        elif dy != 0 and self.try_move(Vector2(0, try_dy)):
+                        elif dy != 0 and self.try_move(UNIT_VECTORS[(0, try_dy)]):
                             allowed_move = (0, try_dy)
                             dy -= try_dy
                         if allowed_move != (0, 0):
-                            self.hero.velocity = Vector2(allowed_move)
+                            self.hero.velocity.update(allowed_move)
                             frame = 0
                             moving = True
                             self.moves += 1
@@ -1231,17 +1443,21 @@ Game instructions go here.
                     # Step frame counter and animate
                     frame = (frame + 1) % self.frames
                     self._group.update(1 / self.frames)
+                    if moving:
+                        self._screen_dirty = True
 
                     # When frame counter wraps, run physics and end movement
                     if frame == 0:
                         self.update_map()
-                        self.hero.velocity = Vector2(0, 0)
+                        self.mark_dirty()
+                        self.hero.velocity.update(0, 0)
                         moving = False
 
-                    # Draw and display screen.
-                    self.draw()
-                    self.show_status()
-                    self.show_screen()
+                    # Draw and display screen, if anything has changed.
+                    if self.redraw_needed():
+                        self.draw()
+                        self.show_status()
+                        self.show_screen()
                 await self.stop_play()
             if self.finished():
                 await self.end_level()
@@ -1259,18 +1475,18 @@ Game instructions go here.
         The base class version finds the hero in the map and sets the
         corresponding tile to `EMPTY`.
         """
-        for x in range(self.level_width):
-            for y in range(self.level_height):
-                block = self.get(Vector2(x, y))
-                if block == self.hero_tile:
-                    self.hero.position = Vector2(x, y)
-                    self.set(self.hero.position, self.empty_tile)
+        # Only active tiles need be searched.
+        for x, y in list(self._active_tiles):
+            if self._tiles[self._map_tiles[y][x]] == self.hero_tile:
+                self.hero.position = Vector2(x, y)
+                self.set(self.hero.position, self.empty_tile)
 
     def try_move(self, delta: Vector2) -> bool:
         """Try to move the hero by the given displacement.
 
         Args:
-            delta (Vector2): the displacement unit vector
+            delta (Vector2): the displacement unit vector, which is shared
+              and must not be modified
 
         Returns:
             bool: `True` if the player can move in that direction, or
@@ -1293,6 +1509,8 @@ Game instructions go here.
         This method prints the current level, and should be overridden by
         game classes to print extra game-specific information.
         """
+        # ptext caches the rendered text, so it is rendered only when the
+        # status line changes.
         self.print_screen(
             (0, 0),
             _("Level {}:").format(self.level)
@@ -1312,12 +1530,11 @@ Game instructions go here.
         Returns:
             bool: a flag indicating whether the current level is finished
         """
-        for x in range(self.level_width):
-            for y in range(self.level_height):
-                block = self.get(Vector2(x, y))
-                if block not in (self.hero_tile, self.default_tile, self.empty_tile):
-                    return False
-        return True
+        # Only active tiles need be examined.
+        return all(
+            self._tiles[self._map_tiles[y][x]] == self.hero_tile
+            for x, y in self._active_tiles
+        )
 
     def exit_game(self) -> None:
         """Exit the game immediately."""
@@ -1329,6 +1546,19 @@ Game instructions go here.
         if len(pygame.event.get(pygame.QUIT)) > 0:
             self.exit_game()
 
+    def _track_held_keys(self, event: pygame.event.Event) -> None:
+        """Track which keys are held down, for the player controls.
+
+        This is called by the event loops themselves, so that it happens
+        even if `handle_global_inputs` is overridden.
+        """
+        if event.type == pygame.KEYDOWN:
+            self._held_keys.add(event.key)
+        elif event.type == pygame.KEYUP:
+            self._held_keys.discard(event.key)
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self._held_keys.clear()
+
     def handle_global_inputs(self, event: pygame.event.Event) -> None:
         """React to inputs that work anywhere in the game.
 
@@ -1365,7 +1595,7 @@ Game instructions go here.
             _ = cat.gettext
 
         metadata = importlib.metadata.metadata(self.game_package_name)
-        self.version = importlib.metadata.version(self.game_package_name)
+        self.version = metadata["Version"]
         homepage = metadata["Project-URL"].removeprefix("Homepage, ")
 
         # Set app name for SDL
@@ -1451,7 +1681,7 @@ Game instructions go here.
         try:
             while self.exit is False:
                 level = await self.title_screen(
-                    self.title_image.convert(),
+                    self.title_image,
                     # TRANSLATORS: Please keep this text wrapped to 40 characters.
                     self.instructions()
                     + "\n"
@@ -1502,8 +1732,11 @@ class Hero(pygame.sprite.Sprite):
         Args:
             dt (float): the elapsed time in milliseconds
         """
-        self.position += self.velocity * dt
-        screen_pos = Vector2(
-            self.position.x * self.tile_size.x, self.position.y * self.tile_size.y
+        # Work on the components, to avoid making temporary vectors.
+        position = self.position
+        position.x += self.velocity.x * dt
+        position.y += self.velocity.y * dt
+        self.rect.topleft = (
+            int(position.x * self.tile_size.x),
+            int(position.y * self.tile_size.y),
         )
-        self.rect.topleft = (int(screen_pos.x), int(screen_pos.y))
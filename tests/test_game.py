@@ -0,0 +1,99 @@
+"""ChamberCourt: tests for the main game loop.
+
+© Reuben Thomas <rrt@sc3d.org> 2026
+
+Released under the GPL version 3, or (at your option) any later version.
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+# Run without a display or sound device.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from chambercourt import game  # noqa: E402
+from chambercourt.chambercourt_game import ChambercourtGame  # noqa: E402
+
+
+def key_event(event_type: int, key: int) -> pygame.event.Event:
+    """Make a keyboard event."""
+    return pygame.event.Event(event_type, key=key, mod=0, unicode="", scancode=0)
+
+
+class ScriptedGame(ChambercourtGame):
+    """A game that plays level 1, posting scripted events on given frames."""
+
+    def __init__(
+        self, script: dict[int, list[pygame.event.Event]], num_frames: int
+    ) -> None:
+        """Create a ScriptedGame object.
+
+        Args:
+            script (dict[int, list[pygame.event.Event]]): the events to post
+              at the start of each frame, indexed by frame number
+            num_frames (int): the number of frames after which to quit
+        """
+        super().__init__()
+        self.script = script
+        self.num_frames = num_frames
+        self.frame_count = 0
+
+    async def title_screen(self, title_image: pygame.Surface, instructions: str) -> int:
+        """Start level 1 straight away."""
+        return 1
+
+    async def clock_tick(self) -> None:
+        """Post the events for this frame, and quit after the last frame."""
+        for event in self.script.get(self.frame_count, []):
+            pygame.event.post(event)
+        self.frame_count += 1
+        if self.frame_count > self.num_frames:
+            self.exit_game()
+
+
+class TestRun(unittest.TestCase):
+    """Tests for `Game.run`."""
+
+    def play(
+        self, script: dict[int, list[pygame.event.Event]], num_frames: int
+    ) -> tuple[float, float]:
+        """Play level 1 with the given script, and return the hero's position."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with mock.patch.object(
+                game, "SAVED_POSITION_FILE", Path(tmpdir) / "saved_position.dat"
+            ):
+                scripted_game = ScriptedGame(script, num_frames)
+                asyncio.run(scripted_game.main([]))
+        return (scripted_game.hero.position.x, scripted_game.hero.position.y)
+
+    def test_release_during_move(self) -> None:
+        """Releasing the keys during a move stops the hero after that move."""
+        # The hero starts at (1, 6), and can move right or up. A move takes
+        # 8 frames; release the keys in the middle of the first one.
+        press = [
+            key_event(pygame.KEYDOWN, pygame.K_RIGHT),
+            key_event(pygame.KEYDOWN, pygame.K_UP),
+        ]
+        release = [
+            key_event(pygame.KEYUP, pygame.K_RIGHT),
+            key_event(pygame.KEYUP, pygame.K_UP),
+        ]
+        self.assertEqual(self.play({5: press, 9: release}, 40), (2, 6))
+
+    def test_hold_during_move(self) -> None:
+        """Holding a key through a move makes the hero keep moving."""
+        press = [key_event(pygame.KEYDOWN, pygame.K_RIGHT)]
+        release = [key_event(pygame.KEYUP, pygame.K_RIGHT)]
+        self.assertEqual(self.play({5: press, 16: release}, 40), (3, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()